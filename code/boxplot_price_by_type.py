@@ -1,110 +1,149 @@
-import pandas as pd
+import os
+
 import matplotlib.pyplot as plt
 import seaborn as sns
-import os
+
+from utils import PNG_PIL_KWARGS, SAVEFIG_DPI, configure_plot, load_house_data
+
+# 必要的列
+REQUIRED_COLUMNS = ["均价", "总价", "类型"]
 
 
-def load_data(csv_file):
+def compute_box_stats(data, value_column):
     """
-    加载 CSV 数据，并进行必要的数据清洗和类型转换。
+    按楼盘类型分组，一次性计算箱线图所需的统计量（四分位数、须和异常值）。
+
+    须的范围与 matplotlib / seaborn 默认一致：延伸到 1.5 倍四分位距以内最远的数据点。
+
+    Parameters:
+    - data: DataFrame，已清洗的数据
+    - value_column: str，需要统计的列名
+
+    Returns:
+    - list of dict，可直接传给 Axes.bxp 的统计量
     """
-    try:
-        data = pd.read_csv(csv_file, encoding="utf-8-sig")
-    except FileNotFoundError:
-        print(f"文件 {csv_file} 未找到。请确保文件路径正确。")
-        return None
-    except pd.errors.EmptyDataError:
-        print(f"文件 {csv_file} 是空的。")
-        return None
-    except pd.errors.ParserError as e:
-        print(f"解析 CSV 文件时出错: {e}")
-        return None
-
-    # 检查必要的列
-    required_columns = ["均价", "总价", "类型"]
-    for col in required_columns:
-        if col not in data.columns:
-            print(f"缺少必要的列: {col}")
-            return None
-
-    # 处理数据类型
-    # 将 '均价' 和 '总价' 转换为数值类型，处理缺失或非数值的数据
-    data["均价"] = pd.to_numeric(data["均价"], errors="coerce")
-    data["总价"] = pd.to_numeric(data["总价"], errors="coerce")
-    data["类型"] = data["类型"].astype(str)
-
-    # 删除含有缺失值的行
-    data = data.dropna(subset=["均价", "总价", "类型"])
-
-    return data
-
-
-def plot_boxplot(data, value_column, y_label, title, output_image):
+    values = data[value_column]
+    types = data["类型"]
+
+    # 四分位数（分组时不排序，只对少量的分组结果按类型排序，保持箱子的顺序）
+    stats = values.groupby(types, sort=False, observed=True).quantile([0.25, 0.5, 0.75]).unstack().sort_index()
+    stats.columns = ["q1", "med", "q3"]
+    iqr = stats["q3"] - stats["q1"]
+
+    # 须：1.5 倍四分位距以内的最小值和最大值
+    lower = (stats["q1"] - 1.5 * iqr).reindex(types).to_numpy()
+    upper = (stats["q3"] + 1.5 * iqr).reindex(types).to_numpy()
+    inside = (values >= lower) & (values <= upper)
+    whiskers = values[inside].groupby(types[inside], sort=False, observed=True).agg(["min", "max"])
+    stats["whislo"] = whiskers["min"].clip(upper=stats["q1"])
+    stats["whishi"] = whiskers["max"].clip(lower=stats["q3"])
+
+    # 异常值
+    fliers = values[~inside].groupby(types[~inside], sort=False, observed=True).agg(list)
+
+    return [
+        {
+            "label": label,
+            "q1": row.q1,
+            "med": row.med,
+            "q3": row.q3,
+            "whislo": row.whislo,
+            "whishi": row.whishi,
+            "fliers": fliers.get(label, []),
+        }
+        for label, row in zip(stats.index, stats.itertuples())
+    ]
+
+
+def plot_boxplot(ax, data, value_column, y_label, title, output_image):
     """
     绘制楼盘类型的单价或总价分布箱线图，并保存为图片文件。
     """
-    plt.figure(figsize=(12, 8))
-    sns.set_theme(style="whitegrid")
-    plt.rcParams["font.sans-serif"] = ["STHeiti"]
 
-    # 创建箱线图
-    sns.boxplot(
-        x="类型",
-        y=value_column,
-        data=data,
-        palette="Set3",
+    # 创建箱线图，直接使用预先计算的统计量绘制
+    box_stats = compute_box_stats(data, value_column)
+    boxes = ax.bxp(
+        box_stats,
+        positions=range(len(box_stats)),
+        widths=0.8,
+        patch_artist=True,
         showfliers=True,  # 显示异常值
+        medianprops={"color": "black"},
     )
+    for patch, color in zip(boxes["boxes"], sns.color_palette("Set3", len(box_stats))):
+        patch.set_facecolor(color)
 
     # 设置图表标题和标签
-    plt.title(title, fontsize=16)
-    plt.xlabel("楼盘类型", fontsize=14)
-    plt.ylabel(y_label, fontsize=14)
+    ax.set_title(title, fontsize=16)
+    ax.set_xlabel("楼盘类型", fontsize=14)
+    ax.set_ylabel(y_label, fontsize=14)
 
     # 添加数值标签（中位数）
-    medians = data.groupby(["类型"])[value_column].median().values
-    for i, median in enumerate(medians):
-        plt.text(i, median, f"{median:.0f}", horizontalalignment="center", color="black", weight="semibold")
+    for i, stat in enumerate(box_stats):
+        median = stat["med"]
+        ax.text(i, median, f"{median:.0f}", horizontalalignment="center", color="black", weight="semibold")
 
-    plt.tight_layout()
-    plt.savefig(output_image, dpi=300)
-    plt.close()
+    ax.figure.tight_layout()
+    ax.figure.savefig(output_image, dpi=SAVEFIG_DPI, pil_kwargs=PNG_PIL_KWARGS)
     print(f"箱线图已保存为 {output_image}")
 
 
-def main():
-    input_csv = "../new_house_data.csv"  # 输入的 CSV 文件路径
+def render(data):
+    """
+    根据已清洗的数据绘制本脚本的全部图表。
+
+    Parameters:
+    - data: DataFrame，包含 REQUIRED_COLUMNS 的已清洗数据
+    """
     output_image_unit_price = "../figire/boxplot_unit_price_by_type.png"  # 输出的单价箱线图路径
     output_image_total_price = "../figire/boxplot_total_price_by_type.png"  # 输出的总价箱线图路径
 
-    # 检查输入文件是否存在
-    if not os.path.exists(input_csv):
-        print(f"输入文件 {input_csv} 不存在。请确保文件路径正确。")
-        return
+    # 设置绘图样式和中文字体
+    sns.set_theme(style="whitegrid")
+    configure_plot()
 
-    # 加载和处理数据
-    data = load_data(input_csv)
-    if data is None or data.empty:
-        print("数据加载失败或数据为空。")
-        return
+    # 两张图表复用同一个 Figure
+    fig, ax = plt.subplots(figsize=(12, 8))
 
     # 绘制平均单价箱线图
     plot_boxplot(
+        ax,
         data=data,
         value_column="均价",
         y_label="均价 (元/㎡)",
         title="各楼盘类型均价分布箱线图",
         output_image=output_image_unit_price,
     )
+    ax.clear()
 
     # 绘制平均总价箱线图
     plot_boxplot(
+        ax,
         data=data,
         value_column="总价",
         y_label="总价 (万元)",
         title="各楼盘类型总价分布箱线图",
         output_image=output_image_total_price,
     )
+    plt.close(fig)
+
+
+def main():
+    input_csv = "../new_house_data.csv"  # 输入的 CSV 文件路径
+
+    # 检查输入文件是否存在
+    if not os.path.exists(input_csv):
+        print(f"输入文件 {input_csv} 不存在。请确保文件路径正确。")
+        return
+
+    # 加载和处理数据
+    data = load_house_data(input_csv, REQUIRED_COLUMNS)
+    if data is None or data.empty:
+        print("数据加载失败或数据为空。")
+        return
+
+    # 绘制图表
+    render(data)
 
 
 if __name__ == "__main__":
@@ -1,109 +1,90 @@
-import pandas as pd
+import os
+
 import matplotlib.pyplot as plt
+import numpy as np
 import seaborn as sns
-import os
 
+from utils import PNG_PIL_KWARGS, SAVEFIG_DPI, configure_plot, load_house_data
 
-def load_data(csv_file):
-    """
-    加载 CSV 数据，并进行必要的数据清洗和类型转换。
-    """
-    try:
-        data = pd.read_csv(csv_file, encoding="utf-8-sig")
-    except FileNotFoundError:
-        print(f"文件 {csv_file} 未找到。请确保文件路径正确。")
-        return None
-    except pd.errors.EmptyDataError:
-        print(f"文件 {csv_file} 是空的。")
-        return None
-    except pd.errors.ParserError as e:
-        print(f"解析 CSV 文件时出错: {e}")
-        return None
-
-    # 检查必要的列
-    required_columns = ["楼盘名称", "类型", "行政区", "房型", "面积", "均价", "总价"]
-    for col in required_columns:
-        if col not in data.columns:
-            print(f"缺少必要的列: {col}")
-            return None
-
-    # 处理数据类型
-    data["房型"] = pd.to_numeric(data["房型"], errors="coerce")
-    data["均价"] = pd.to_numeric(data["均价"], errors="coerce")
-    data["总价"] = pd.to_numeric(data["总价"], errors="coerce")
-    data["类型"] = data["类型"].astype(str)
-    data["行政区"] = data["行政区"].astype(str)
-
-    # 删除含有缺失值的行
-    data = data.dropna(subset=["楼盘名称", "类型", "行政区", "房型", "面积", "均价", "总价"])
-
-    return data
+# 必要的列
+REQUIRED_COLUMNS = ["楼盘名称", "类型", "行政区", "房型", "面积", "均价", "总价"]
 
 
 def prepare_grouped_data(data):
     """
     按行政区和房型分组，计算每组的平均单价和平均总价。
     """
-    grouped = data.groupby(["行政区", "房型"]).agg(平均单价=("均价", "mean"), 平均总价=("总价", "mean")).reset_index()
+    grouped = (
+        data.groupby(["行政区", "房型"], sort=False, observed=True)
+        .agg(平均单价=("均价", "mean"), 平均总价=("总价", "mean"))
+        .reset_index()
+    )
 
     return grouped
 
 
-def plot_grouped_bar_chart(grouped_data, output_image, metric="平均单价"):
+def plot_grouped_bar_chart(ax, grouped_data, output_image, metric="平均单价"):
     """
     绘制各行政区房型的平均单价或总价的分组柱状图，并保存为图片文件。
 
     Parameters:
+    - ax: Axes，绘图使用的坐标轴
     - grouped_data: DataFrame，包含行政区、房型、平均单价和平均总价
     - output_image: str，输出图片文件路径
     - metric: str，用于展示的指标，可以是 '平均单价' 或 '平均总价'
     """
-    plt.figure(figsize=(16, 10))
-    sns.set_theme(style="whitegrid")
-    plt.rcParams["font.sans-serif"] = ["STHeiti"]
 
-    # 确定绘图的指标
-    y = metric
+    # 转换为 行政区 × 房型 的矩阵，每种房型一组柱子
+    pivot = grouped_data.pivot(index="行政区", columns="房型", values=metric)
+    n_districts, n_rooms = pivot.shape
+    bar_width = 0.8 / n_rooms
+    colors = sns.color_palette("Set2", n_colors=n_rooms, desat=0.75)
 
     # 创建分组柱状图
-    sns.barplot(data=grouped_data, x="行政区", y=y, hue="房型", palette="Set2")
+    x = np.arange(n_districts)
+    for i, (room, color) in enumerate(zip(pivot.columns, colors)):
+        offsets = (i - (n_rooms - 1) / 2) * bar_width
+        ax.bar(x + offsets, pivot[room].to_numpy(), bar_width, color=color, label=room)
+
+    # 设置 x 轴
+    ax.set_xticks(x, labels=pivot.index)
+    ax.set_xlim(-0.5, n_districts - 0.5)
+    ax.xaxis.grid(False)
 
     # 设置标题和标签
-    plt.title(f"各行政区房型的{metric}分布", fontsize=20)
-    plt.xlabel("行政区", fontsize=16)
-    plt.ylabel(metric, fontsize=16)
+    ax.set_title(f"各行政区房型的{metric}分布", fontsize=20)
+    ax.set_xlabel("行政区", fontsize=16)
+    ax.set_ylabel(metric, fontsize=16)
 
     # 设置图例标题
-    plt.legend(title="房型", title_fontsize=14, fontsize=12)
+    ax.legend(title="房型", title_fontsize=14, fontsize=12)
 
-    # 添加数据标签
-    for container in plt.gca().containers:
-        plt.gca().bar_label(container, fmt="%.0f", padding=3, fontsize=10)
+    # 添加数据标签（跳过没有数据的组合）
+    for container in ax.containers:
+        labels = ["" if np.isnan(value) else f"{value:.0f}" for value in container.datavalues]
+        ax.bar_label(container, labels=labels, padding=3, fontsize=10)
 
     # 调整布局
-    plt.tight_layout()
+    ax.figure.tight_layout()
 
     # 保存图表
-    plt.savefig(output_image, dpi=300)
-    plt.close()
+    ax.figure.savefig(output_image, dpi=SAVEFIG_DPI, pil_kwargs=PNG_PIL_KWARGS)
     print(f"分组柱状图已保存为 {output_image}")
 
 
-def main():
-    input_csv = "../new_house_data.csv"  # 输入的 CSV 文件路径
+def render(data):
+    """
+    根据已清洗的数据绘制本脚本的全部图表。
+
+    Parameters:
+    - data: DataFrame，包含 REQUIRED_COLUMNS 的已清洗数据
+    """
     output_image_unit_price = "../figire/grouped_bar_average_unit_price.png"  # 输出的按平均单价的分组柱状图路径
     output_image_total_price = "../figire/grouped_bar_average_total_price.png"  # 输出的按平均总价的分组柱状图路径
 
-    # 检查输入文件是否存在
-    if not os.path.exists(input_csv):
-        print(f"输入文件 {input_csv} 不存在。请确保文件路径正确。")
-        return
-
-    # 加载和处理数据
-    data = load_data(input_csv)
-    if data is None or data.empty:
-        print("数据加载失败或数据为空。")
-        return
+    # 设置绘图样式和中文字体
+    sns.set_theme(style="whitegrid")
+    configure_plot()
 
     # 准备分组数据
     grouped_data = prepare_grouped_data(data)
@@ -111,11 +92,34 @@ def main():
         print("分组后的数据为空。")
         return
 
+    # 两张图表复用同一个 Figure
+    fig, ax = plt.subplots(figsize=(16, 10))
+
     # 绘制按平均单价的分组柱状图
-    plot_grouped_bar_chart(grouped_data=grouped_data, output_image=output_image_unit_price, metric="平均单价")
+    plot_grouped_bar_chart(ax, grouped_data=grouped_data, output_image=output_image_unit_price, metric="平均单价")
+    ax.clear()
 
     # 绘制按平均总价的分组柱状图
-    plot_grouped_bar_chart(grouped_data=grouped_data, output_image=output_image_total_price, metric="平均总价")
+    plot_grouped_bar_chart(ax, grouped_data=grouped_data, output_image=output_image_total_price, metric="平均总价")
+    plt.close(fig)
+
+
+def main():
+    input_csv = "../new_house_data.csv"  # 输入的 CSV 文件路径
+
+    # 检查输入文件是否存在
+    if not os.path.exists(input_csv):
+        print(f"输入文件 {input_csv} 不存在。请确保文件路径正确。")
+        return
+
+    # 加载和处理数据
+    data = load_house_data(input_csv, REQUIRED_COLUMNS)
+    if data is None or data.empty:
+        print("数据加载失败或数据为空。")
+        return
+
+    # 绘制图表
+    render(data)
 
 
 if __name__ == "__main__":
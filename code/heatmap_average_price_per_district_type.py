@@ -1,100 +1,86 @@
-import pandas as pd
+import os
+
 import matplotlib.pyplot as plt
+import numpy as np
 import seaborn as sns
-import os
 
+from utils import PNG_PIL_KWARGS, SAVEFIG_DPI, configure_plot, load_house_data
 
-def load_data(csv_file):
-    """
-    加载 CSV 数据，并进行必要的数据清洗和类型转换。
-    """
-    try:
-        data = pd.read_csv(csv_file, encoding="utf-8-sig")
-    except FileNotFoundError:
-        print(f"文件 {csv_file} 未找到。请确保文件路径正确。")
-        return None
-    except pd.errors.EmptyDataError:
-        print(f"文件 {csv_file} 是空的。")
-        return None
-    except pd.errors.ParserError as e:
-        print(f"解析 CSV 文件时出错: {e}")
-        return None
-
-    # 检查必要的列
-    required_columns = ["均价", "总价", "行政区", "类型"]
-    for col in required_columns:
-        if col not in data.columns:
-            print(f"缺少必要的列: {col}")
-            return None
-
-    # 处理数据类型
-    # 将 '均价' 和 '总价' 转换为数值类型，处理缺失或非数值的数据
-    data["均价"] = pd.to_numeric(data["均价"], errors="coerce")
-    data["总价"] = pd.to_numeric(data["总价"], errors="coerce")
-    data["行政区"] = data["行政区"].astype(str)
-    data["类型"] = data["类型"].astype(str)
-
-    # 删除含有缺失值的行
-    data = data.dropna(subset=["均价", "总价", "行政区", "类型"])
-
-    return data
+# 必要的列
+REQUIRED_COLUMNS = ["均价", "总价", "行政区", "类型"]
 
 
 def compute_average_prices(data):
     """
     按行政区和楼盘类型分组，计算平均单价和平均总价。
     """
-    grouped = data.groupby(["行政区", "类型"]).agg(平均单价=("均价", "mean"), 平均总价=("总价", "mean")).reset_index()
+    # 分组时不排序，只对少量的分组结果排序，保持热力图行列的顺序
+    grouped = data.groupby(["行政区", "类型"], sort=False, observed=True)[["均价", "总价"]].mean().sort_index()
 
-    # 创建透视表
-    pivot_unit_price = grouped.pivot(index="行政区", columns="类型", values="平均单价")
-    pivot_total_price = grouped.pivot(index="行政区", columns="类型", values="平均总价")
+    # 创建透视表，直接在分组结果的 MultiIndex 上展开
+    pivot_unit_price = grouped["均价"].unstack("类型")
+    pivot_total_price = grouped["总价"].unstack("类型")
 
     return pivot_unit_price, pivot_total_price
 
 
-def plot_heatmap(pivot_table, title, y_label, output_image, fmt=".0f", cmap="YlGnBu"):
+def plot_heatmap(ax, pivot_table, title, y_label, output_image, fmt=".0f", cmap="YlGnBu"):
     """
     绘制热力图，并保存为图片文件。
     """
-    plt.figure(figsize=(12, 8))
-    sns.set_theme(style="white")
-    plt.rcParams["font.sans-serif"] = ["STHeiti"]
 
-    # 创建热力图
-    sns.heatmap(
-        pivot_table, annot=True, fmt=fmt, cmap=cmap, linewidths=0.5, linecolor="gray", cbar_kws={"label": y_label}
-    )
+    # 创建热力图，缺失的组合留空
+    values = np.ma.masked_invalid(pivot_table.to_numpy(dtype=float))
+    mesh = ax.pcolormesh(values, cmap=cmap, edgecolors="gray", linewidth=0.5)
+    cbar = ax.figure.colorbar(mesh, ax=ax, label=y_label)
+    cbar.outline.set_visible(False)
+
+    # 添加数值标签，根据格子颜色的亮度选择黑色或白色文字
+    rgb = mesh.cmap(mesh.norm(values))[..., :3]
+    rgb = np.where(rgb <= 0.03928, rgb / 12.92, ((rgb + 0.055) / 1.055) ** 2.4)
+    luminance = rgb @ np.array([0.2126, 0.7152, 0.0722])
+    for (i, j), value in np.ndenumerate(values.filled(np.nan)):
+        if not np.isnan(value):
+            color = ".15" if luminance[i, j] > 0.408 else "w"
+            ax.text(j + 0.5, i + 0.5, f"{value:{fmt}}", ha="center", va="center", color=color)
+
+    # 设置坐标轴，第一行显示在最上方
+    ax.set_xticks(np.arange(values.shape[1]) + 0.5, labels=pivot_table.columns)
+    ax.set_yticks(np.arange(values.shape[0]) + 0.5, labels=pivot_table.index, rotation=0)
+    ax.set_xlim(0, values.shape[1])
+    ax.set_ylim(values.shape[0], 0)
+    for spine in ax.spines.values():
+        spine.set_visible(False)
 
     # 设置标题和标签
-    plt.title(title, fontsize=16, pad=20)
-    plt.xlabel("楼盘类型", fontsize=14)
-    plt.ylabel("行政区", fontsize=14)
+    ax.set_title(title, fontsize=16, pad=20)
+    ax.set_xlabel("楼盘类型", fontsize=14)
+    ax.set_ylabel("行政区", fontsize=14)
 
     # 调整布局
-    plt.tight_layout()
+    ax.figure.tight_layout()
 
     # 保存图表
-    plt.savefig(output_image, dpi=300)
-    plt.close()
+    ax.figure.savefig(output_image, dpi=SAVEFIG_DPI, pil_kwargs=PNG_PIL_KWARGS)
     print(f"热力图已保存为 {output_image}")
 
+    # 移除色标，恢复坐标轴原来的大小，以便复用
+    cbar.remove()
 
-def main():
-    input_csv = "../new_house_data.csv"  # 输入的 CSV 文件路径
+
+def render(data):
+    """
+    根据已清洗的数据绘制本脚本的全部图表。
+
+    Parameters:
+    - data: DataFrame，包含 REQUIRED_COLUMNS 的已清洗数据
+    """
     output_image_unit_price = "../figire/heatmap_average_unit_price_per_district_type.png"  # 输出的平均单价热力图路径
     output_image_total_price = "../figire/heatmap_average_total_price_per_district_type.png"  # 输出的平均总价热力图路径
 
-    # 检查输入文件是否存在
-    if not os.path.exists(input_csv):
-        print(f"输入文件 {input_csv} 不存在。请确保文件路径正确。")
-        return
-
-    # 加载和处理数据
-    data = load_data(input_csv)
-    if data is None or data.empty:
-        print("数据加载失败或数据为空。")
-        return
+    # 设置绘图样式和中文字体
+    sns.set_theme(style="white")
+    configure_plot()
 
     # 计算平均单价和总价
     pivot_unit_price, pivot_total_price = compute_average_prices(data)
@@ -104,8 +90,12 @@ def main():
         print("分组后的数据为空。")
         return
 
+    # 两张图表复用同一个 Figure
+    fig, ax = plt.subplots(figsize=(12, 8))
+
     # 绘制平均单价热力图
     plot_heatmap(
+        ax,
         pivot_table=pivot_unit_price,
         title="各行政区与楼盘类型的平均单价热力图",
         y_label="平均单价 (元/㎡)",
@@ -113,9 +103,11 @@ def main():
         fmt=".0f",
         cmap="YlGnBu",
     )
+    ax.clear()
 
     # 绘制平均总价热力图
     plot_heatmap(
+        ax,
         pivot_table=pivot_total_price,
         title="各行政区与楼盘类型的平均总价热力图",
         y_label="平均总价 (万元)",
@@ -123,6 +115,25 @@ def main():
         fmt=".0f",
         cmap="YlOrRd",
     )
+    plt.close(fig)
+
+
+def main():
+    input_csv = "../new_house_data.csv"  # 输入的 CSV 文件路径
+
+    # 检查输入文件是否存在
+    if not os.path.exists(input_csv):
+        print(f"输入文件 {input_csv} 不存在。请确保文件路径正确。")
+        return
+
+    # 加载和处理数据
+    data = load_house_data(input_csv, REQUIRED_COLUMNS)
+    if data is None or data.empty:
+        print("数据加载失败或数据为空。")
+        return
+
+    # 绘制图表
+    render(data)
 
 
 if __name__ == "__main__":
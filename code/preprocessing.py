@@ -1,102 +1,114 @@
-import json
-import csv
 import re
 
+import numpy as np
+import orjson
+import pandas as pd
+import pyarrow as pa
+import pyarrow.compute as pc
 
-def extract_number(text):
+# 整数或小数（小数点后必须有数字，避免回溯）
+NUMBER_PATTERN = r"\d+(?:\.\d+)?"
+# 预编译，用于提取房型中的所有数字
+NUMBER_RE = re.compile(NUMBER_PATTERN)
+# 第一个数字，以及可能存在的第二个数字（相邻两个数字之间至少隔着一个非数字字符），由 Arrow 的 RE2 引擎批量匹配
+FIRST_NUMBER_PATTERN = f"(?P<first>{NUMBER_PATTERN})"
+TWO_NUMBERS_PATTERN = f"(?P<first>{NUMBER_PATTERN})(?:\\D+(?P<second>{NUMBER_PATTERN}))?"
+
+# 定义 CSV 的字段名
+FIELDNAMES = ["楼盘名称", "类型", "行政区", "街道", "具体位置", "房型", "面积", "总价", "均价"]
+
+
+def clean_str(values):
+    """
+    去掉字符串的前后空格，如果值为 None 或非字符串，则返回空字符串
+    """
+    return [value.strip() if isinstance(value, str) else "" for value in values]
+
+
+def extract_numbers(values, pattern):
+    """
+    在 Arrow 中批量匹配 pattern，返回各命名分组对应的浮点数数组，未匹配的位置为 NaN
+
+    Parameters:
+    - values: iterable，原始字段值，非字符串的值视为缺失值
+    - pattern: str，带命名分组的正则表达式
+
+    Returns:
+    - dict，分组名到 ndarray 的映射
+    """
+    strings = pa.array([value if isinstance(value, str) else None for value in values], type=pa.string())
+    matches = pc.extract_regex(strings, pattern)
+
+    numbers = {}
+    for name in matches.type.names:
+        group = pc.struct_field(matches, name)
+        # 可选分组没有匹配时为空字符串
+        group = pc.if_else(pc.equal(group, ""), None, group)
+        numbers[name] = pc.cast(group, pa.float64()).to_numpy(zero_copy_only=False)
+    return numbers
+
+
+def extract_first_number(values):
     """
-    从字符串中提取所有数字，支持整数和小数
+    提取每个字符串中的第一个数字，并截断为整数
     """
-    return re.findall(r"\d+\.?\d*", text)
+    numbers = extract_numbers(values, FIRST_NUMBER_PATTERN)["first"]
+    return pd.array(np.trunc(numbers), dtype="Int64")
 
 
-def safe_get_str(record, key):
+def average_room(rooms):
     """
-    安全地获取字符串值，如果值为 None 或非字符串，则返回空字符串
+    取房型列表中所有数字的平均值，并四舍五入为整数；没有数字时返回 None
     """
-    value = record.get(key, "")
-    return value.strip() if isinstance(value, str) else ""
+    if not isinstance(rooms, list):
+        return None
+    numbers = [float(number) for room in rooms if isinstance(room, str) for number in NUMBER_RE.findall(room)]
+    return round(sum(numbers) / len(numbers)) if numbers else None
 
 
-def process_record(record):
+def process_records(records):
     """
-    处理单个 JSON 记录，返回一个字典符合 CSV 结构
+    按字段批量处理 JSON 记录，返回一个符合 CSV 结构的 DataFrame
     """
     processed = {}
 
     # 1. 楼盘名称
-    processed["楼盘名称"] = safe_get_str(record, "name")
+    processed["楼盘名称"] = clean_str(record.get("name") for record in records)
 
     # 2. 类型
-    processed["类型"] = safe_get_str(record, "type")
+    processed["类型"] = clean_str(record.get("type") for record in records)
 
     # 3. 地理位置（分为行政区、街道、具体位置）
-    locations = record.get("location", [])
-    if not isinstance(locations, list):
-        locations = []
-    location_fields = ["行政区", "街道", "具体位置"]
-    for i, field in enumerate(location_fields):
-        if i < len(locations) and isinstance(locations[i], str):
-            processed[field] = locations[i].strip()
-        else:
-            processed[field] = ""
-
-    # 4. 房型（取平均值）
-    rooms = record.get("room", [])
-    if not isinstance(rooms, list):
-        rooms = []
-    room_numbers = []
-    for room in rooms:
-        if isinstance(room, str):
-            nums = extract_number(room)
-            if nums:
-                room_numbers.extend([float(num) for num in nums])
-    if room_numbers:
-        avg_room = sum(room_numbers) / len(room_numbers)
-        processed["房型"] = round(avg_room)
-    else:
-        processed["房型"] = ""
-
-    # 5. 面积（取平均值）
-    area_text = safe_get_str(record, "area")
-    area_numbers = extract_number(area_text)
-    if len(area_numbers) >= 2:
-        lower = float(area_numbers[0])
-        upper = float(area_numbers[1])
-        avg_area = (lower + upper) / 2
-        processed["面积"] = round(avg_area)
-    elif len(area_numbers) == 1:
-        processed["面积"] = round(float(area_numbers[0]))
-    else:
-        processed["面积"] = ""
+    locations = [record.get("location") for record in records]
+    locations = [location if isinstance(location, list) else [] for location in locations]
+    for i, field in enumerate(["行政区", "街道", "具体位置"]):
+        processed[field] = clean_str(location[i] if i < len(location) else None for location in locations)
+
+    # 4. 房型（取所有房型中数字的平均值）
+    processed["房型"] = pd.array([average_room(record.get("room")) for record in records], dtype="Int64")
+
+    # 5. 面积（取前两个数字的平均值）
+    area = extract_numbers((record.get("area") for record in records), TWO_NUMBERS_PATTERN)
+    area_mean = np.where(np.isnan(area["second"]), area["first"], (area["first"] + area["second"]) / 2)
+    processed["面积"] = pd.array(np.round(area_mean), dtype="Int64")
 
     # 6. 总价（万元，整数）
-    total_price_text = safe_get_str(record, "total_price")
-    total_price_nums = extract_number(total_price_text)
-    if total_price_nums:
-        processed["总价"] = int(float(total_price_nums[0]))
-    else:
-        processed["总价"] = ""
+    processed["总价"] = extract_first_number(record.get("total_price") for record in records)
 
     # 7. 均价（元，整数）
-    unit_price_text = safe_get_str(record, "unit_price")
-    unit_price_nums = extract_number(unit_price_text)
-    if unit_price_nums:
-        processed["均价"] = int(float(unit_price_nums[0]))
-    else:
-        processed["均价"] = ""
+    processed["均价"] = extract_first_number(record.get("unit_price") for record in records)
 
-    return processed
+    return pd.DataFrame(processed, columns=FIELDNAMES)
 
 
 def json_to_csv(json_file, csv_file):
     """
     将 JSON 文件转换为 CSV 文件，按照指定的预处理规则
     """
-    with open(json_file, "r", encoding="utf-8") as f:
+    with open(json_file, "rb") as f:
         try:
-            data = json.load(f)
-        except json.JSONDecodeError as e:
+            data = orjson.loads(f.read())
+        except orjson.JSONDecodeError as e:
             print(f"JSON 解码错误: {e}")
             return
 
@@ -104,19 +116,17 @@ def json_to_csv(json_file, csv_file):
     if not isinstance(data, list):
         data = [data]
 
-    # 定义 CSV 的字段名
-    fieldnames = ["楼盘名称", "类型", "行政区", "街道", "具体位置", "房型", "面积", "总价", "均价"]
+    records = []
+    for record in data:
+        if not isinstance(record, dict):
+            print(f"跳过非字典类型的记录: {record}")
+            continue
+        records.append(record)
 
-    with open(csv_file, "w", encoding="utf-8-sig", newline="") as f:
-        writer = csv.DictWriter(f, fieldnames=fieldnames)
-        writer.writeheader()
+    processed = process_records(records)
 
-        for record in data:
-            if not isinstance(record, dict):
-                print(f"跳过非字典类型的记录: {record}")
-                continue
-            processed = process_record(record)
-            writer.writerow(processed)
+    # 一次性写入 CSV
+    processed.to_csv(csv_file, index=False, encoding="utf-8-sig", lineterminator="\r\n")
 
 
 if __name__ == "__main__":
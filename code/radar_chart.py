@@ -1,74 +1,40 @@
 import os
 
-import matplotlib.pyplot as plt
 import numpy as np
 import pandas as pd
+from matplotlib.figure import Figure
 
+from utils import HIGH_RES_DPI, PNG_PIL_KWARGS, compute_cross_sums, configure_plot, load_house_data
 
-def load_data(csv_file):
-    """
-    加载 CSV 数据，并进行必要的数据清洗和类型转换。
+# 必要的列
+REQUIRED_COLUMNS = ["楼盘名称", "类型", "行政区", "房型", "面积", "均价", "总价"]
+# 需要求平均值的数值列，以及对应的指标名称
+VALUE_COLUMNS = ["面积", "房型", "均价", "总价"]
+MEAN_METRICS = ["平均面积", "平均房型", "平均单价", "平均总价"]
+# 雷达图的各个维度，以及每个维度所在的角度（末尾重复第一个角度以完成闭环）
+RADAR_METRICS = MEAN_METRICS + ["楼盘数量"]
+RADAR_ANGLES = np.linspace(0, 2 * np.pi, len(RADAR_METRICS), endpoint=False)
+RADAR_ANGLES_CLOSED = np.append(RADAR_ANGLES, RADAR_ANGLES[0])
 
-    Parameters:
-    - csv_file: str，CSV 文件路径
 
-    Returns:
-    - DataFrame 或 None
+def prepare_radar_data(counts, sums, categories, group_by="行政区"):
     """
-    try:
-        data = pd.read_csv(csv_file, encoding="utf-8-sig")
-    except FileNotFoundError:
-        print(f"文件 {csv_file} 未找到。请确保文件路径正确。")
-        return None
-    except pd.errors.EmptyDataError:
-        print(f"文件 {csv_file} 是空的。")
-        return None
-    except pd.errors.ParserError as e:
-        print(f"解析 CSV 文件时出错: {e}")
-        return None
-
-    # 检查必要的列
-    required_columns = ["楼盘名称", "类型", "行政区", "房型", "面积", "均价", "总价"]
-    for col in required_columns:
-        if col not in data.columns:
-            print(f"缺少必要的列: {col}")
-            return None
-
-    # 处理数据类型
-    data["房型"] = pd.to_numeric(data["房型"], errors="coerce")
-    data["均价"] = pd.to_numeric(data["均价"], errors="coerce")
-    data["总价"] = pd.to_numeric(data["总价"], errors="coerce")
-    data["类型"] = data["类型"].astype(str)
-    data["行政区"] = data["行政区"].astype(str)
-
-    # 删除含有缺失值的行
-    data = data.dropna(subset=["楼盘名称", "类型", "行政区", "房型", "面积", "均价", "总价"])
-
-    return data
-
-
-def prepare_radar_data(data, group_by="行政区"):
-    """
-    按指定类别分组，计算各组的关键指标平均值。
+    由各类别的楼盘数量和数值列之和，计算各组的关键指标平均值。
 
     Parameters:
-    - data: DataFrame，已清洗的数据
+    - counts: ndarray，各类别的楼盘数量
+    - sums: ndarray，各类别 VALUE_COLUMNS 各列之和
+    - categories: Index，与 counts 一一对应的类别
     - group_by: str，用于分组的列名，如 '行政区' 或 '类型'
 
     Returns:
     - DataFrame，包含分组后的平均指标
     """
-    grouped = (
-        data.groupby(group_by)
-        .agg(
-            平均面积=("面积", "mean"),
-            平均房型=("房型", "mean"),
-            平均单价=("均价", "mean"),
-            平均总价=("总价", "mean"),
-            楼盘数量=("楼盘名称", "count"),
-        )
-        .reset_index()
-    )
+    # 只保留出现过的类别，按类别顺序排列
+    observed = counts > 0
+    grouped = pd.DataFrame(sums[observed] / counts[observed, None], columns=MEAN_METRICS)
+    grouped.insert(0, group_by, categories[observed])
+    grouped["楼盘数量"] = counts[observed]
 
     return grouped
 
@@ -84,15 +50,15 @@ def normalize_data(df, metrics):
     Returns:
     - DataFrame，包含归一化后的指标
     """
-    df_norm = df.copy()
-    for metric in metrics:
-        min_val = df[metric].min()
-        max_val = df[metric].max()
-        if max_val - min_val == 0:
-            df_norm[metric] = 0
-        else:
-            df_norm[metric] = (df[metric] - min_val) / (max_val - min_val)
-    return df_norm
+    # 一次性计算所有指标的最小值和范围，范围为 0 的指标归一化为 0
+    values = df[metrics].to_numpy(dtype=np.float64)
+    min_vals = values.min(axis=0)
+    ranges = values.max(axis=0) - min_vals
+    normalized = np.where(ranges == 0, 0.0, (values - min_vals) / np.where(ranges == 0, 1.0, ranges))
+
+    # 只选取非指标列，再附加归一化后的指标，避免复制整个 DataFrame
+    other_columns = [col for col in df.columns if col not in metrics]
+    return df[other_columns].assign(**dict(zip(metrics, normalized.T)))
 
 
 def plot_radar_chart(grouped_data, output_image, group_by="行政区", max_vars=20):
@@ -105,32 +71,25 @@ def plot_radar_chart(grouped_data, output_image, group_by="行政区", max_vars=
     - group_by: str，用于分组的列名，如 '行政区' 或 '类型'
     - max_vars: int，雷达图显示的最大类别数量
     """
-    # 选择前max_vars个类别
+    # 选择楼盘数量最多的 max_vars 个类别，并保持原来的类别顺序
     if len(grouped_data) > max_vars:
-        grouped_data = grouped_data.head(max_vars)
-        print(f"数据量较大，已选择前 {max_vars} 个 {group_by} 进行绘制。")
-
-    categories = ["平均面积", "平均房型", "平均单价", "平均总价", "楼盘数量"]
-    N = len(categories)
-
-    # 计算角度
-    angles = np.linspace(0, 2 * np.pi, N, endpoint=False).tolist()
-    angles += angles[:1]  # 完成闭环
+        grouped_data = grouped_data.nlargest(max_vars, "楼盘数量").sort_index()
+        print(f"数据量较大，已选择楼盘数量最多的 {max_vars} 个 {group_by} 进行绘制。")
 
-    # 设置雷达图
-    fig, ax = plt.subplots(figsize=(10, 10), subplot_kw=dict(polar=True))
-    plt.rcParams["font.sans-serif"] = ["STHeiti"]
+    # 设置雷达图（直接使用 Figure，不经过 pyplot 的全局状态，用完即被回收）
+    fig = Figure(figsize=(10, 10))
+    ax = fig.add_subplot(polar=True)
 
     # 绘制每个类别
-    for idx, row in grouped_data.iterrows():
-        values = row[categories].tolist()
-        values += values[:1]  # 完成闭环
-        ax.plot(angles, values, label=row[group_by], linewidth=2)
-        ax.fill(angles, values, alpha=0.25)
+    category_values = grouped_data[RADAR_METRICS].to_numpy()
+    category_values = np.concatenate([category_values, category_values[:, :1]], axis=1)  # 完成闭环
+    for label, values in zip(grouped_data[group_by].to_numpy(), category_values):
+        ax.plot(RADAR_ANGLES_CLOSED, values, label=label, linewidth=2)
+        ax.fill(RADAR_ANGLES_CLOSED, values, alpha=0.25)
 
     # 设置类别标签
-    ax.set_xticks(angles[:-1])
-    ax.set_xticklabels(categories, fontsize=12)
+    ax.set_xticks(RADAR_ANGLES)
+    ax.set_xticklabels(RADAR_METRICS, fontsize=12)
 
     # 设置 Y 轴
     ax.set_rlabel_position(30)
@@ -139,57 +98,78 @@ def plot_radar_chart(grouped_data, output_image, group_by="行政区", max_vars=
     ax.set_ylim(0, 1)
 
     # 添加标题和图例
-    plt.title(f"{group_by}的楼盘综合指标雷达图", fontsize=16, y=1.08)
-    plt.legend(loc="upper right", bbox_to_anchor=(1.3, 1.1))
+    ax.set_title(f"{group_by}的楼盘综合指标雷达图", fontsize=16, y=1.08)
+    ax.legend(loc="upper right", bbox_to_anchor=(1.3, 1.1))
 
     # 保存图表
-    plt.tight_layout()
-    plt.savefig(output_image, dpi=300, bbox_inches="tight")
-    plt.close()
+    fig.tight_layout()
+    fig.savefig(output_image, dpi=HIGH_RES_DPI, pil_kwargs=PNG_PIL_KWARGS, bbox_inches="tight")
     print(f"雷达图已保存为 {output_image}")
 
 
-def main():
-    input_csv = "../new_house_data.csv"  # 输入的 CSV 文件路径
+def render(data):
+    """
+    根据已清洗的数据绘制本脚本的全部图表。
+
+    Parameters:
+    - data: DataFrame，包含 REQUIRED_COLUMNS 的已清洗数据
+    """
     output_image_radar_admin = "../figure/radar_chart_administrative_district.png"  # 输出的雷达图路径（按行政区）
     output_image_radar_type = "../figure/radar_chart_property_type.png"  # 输出的雷达图路径（按楼盘类型）
 
-    # 检查输入文件是否存在
-    if not os.path.exists(input_csv):
-        print(f"输入文件 {input_csv} 不存在。请确保文件路径正确。")
-        return
+    # 设置绘图样式和中文字体
+    configure_plot()
 
-    # 加载和处理数据
-    data = load_data(input_csv)
-    if data is None or data.empty:
-        print("数据加载失败或数据为空。")
-        return
+    # 只按 行政区 × 类型 的组合扫描一次数据，两种分组的结果都由交叉表汇总得到
+    values = data[VALUE_COLUMNS].to_numpy(dtype=np.float64)
+    counts, sums = compute_cross_sums(values, data["行政区"], data["类型"])
 
     # 准备按行政区分组的数据
-    grouped_admin = prepare_radar_data(data, group_by="行政区")
+    grouped_admin = prepare_radar_data(
+        counts.sum(axis=1), sums.sum(axis=1), data["行政区"].cat.categories, group_by="行政区"
+    )
     if grouped_admin.empty:
         print("按行政区分组后的数据为空。")
         return
 
     # 归一化指标
-    metrics = ["平均面积", "平均房型", "平均单价", "平均总价", "楼盘数量"]
-    grouped_admin_norm = normalize_data(grouped_admin, metrics)
+    grouped_admin_norm = normalize_data(grouped_admin, RADAR_METRICS)
 
     # 绘制按行政区分组的雷达图
     plot_radar_chart(grouped_admin_norm, output_image_radar_admin, group_by="行政区", max_vars=20)
 
     # 准备按楼盘类型分组的数据
-    grouped_type = prepare_radar_data(data, group_by="类型")
+    grouped_type = prepare_radar_data(
+        counts.sum(axis=0), sums.sum(axis=0), data["类型"].cat.categories, group_by="类型"
+    )
     if grouped_type.empty:
         print("按楼盘类型分组后的数据为空。")
         return
 
     # 归一化指标
-    grouped_type_norm = normalize_data(grouped_type, metrics)
+    grouped_type_norm = normalize_data(grouped_type, RADAR_METRICS)
 
     # 绘制按楼盘类型分组的雷达图
     plot_radar_chart(grouped_type_norm, output_image_radar_type, group_by="类型", max_vars=20)
 
 
+def main():
+    input_csv = "../new_house_data.csv"  # 输入的 CSV 文件路径
+
+    # 检查输入文件是否存在
+    if not os.path.exists(input_csv):
+        print(f"输入文件 {input_csv} 不存在。请确保文件路径正确。")
+        return
+
+    # 加载和处理数据
+    data = load_house_data(input_csv, REQUIRED_COLUMNS)
+    if data is None or data.empty:
+        print("数据加载失败或数据为空。")
+        return
+
+    # 绘制图表
+    render(data)
+
+
 if __name__ == "__main__":
     main()
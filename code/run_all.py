@@ -0,0 +1,75 @@
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import matplotlib
+
+import average_price_per_district
+import boxplot_price_by_type
+import bubble_scatter
+import grouped_bar_average_price
+import heatmap_average_price_per_district_type
+import price_distribution
+import price_distribution_type
+import radar_chart
+import treemap_average_price
+from utils import clean_house_data, read_house_data
+
+# 需要运行的绘图脚本，每个脚本提供 REQUIRED_COLUMNS 和 render(data)
+SCRIPTS = [
+    average_price_per_district,
+    boxplot_price_by_type,
+    bubble_scatter,
+    grouped_bar_average_price,
+    heatmap_average_price_per_district_type,
+    price_distribution,
+    price_distribution_type,
+    radar_chart,
+    treemap_average_price,
+]
+
+
+def render_with_default_style(render, data):
+    """
+    恢复 matplotlib 默认样式后调用脚本的 render。
+
+    同一个工作进程会依次运行多个脚本，前一个脚本设置的 seaborn 主题不应影响后面的脚本。
+    """
+    matplotlib.style.use("default")
+    render(data)
+
+
+def main():
+    input_csv = "../new_house_data.csv"  # 输入的 CSV 文件路径
+
+    # 检查输入文件是否存在
+    if not os.path.exists(input_csv):
+        print(f"输入文件 {input_csv} 不存在。请确保文件路径正确。")
+        return
+
+    # 一次性加载所有脚本需要的列
+    columns = list(dict.fromkeys(col for script in SCRIPTS for col in script.REQUIRED_COLUMNS))
+    data = read_house_data(input_csv, columns)
+    if data is None or data.empty:
+        print("数据加载失败或数据为空。")
+        return
+
+    # 各脚本之间没有数据依赖，在多个进程中并行绘图。
+    # 读取数据时 pyarrow 已启动线程池，在多线程进程中 fork 可能导致子进程死锁，因此用 forkserver 启动工作进程
+    with ProcessPoolExecutor(
+        max_workers=min(len(SCRIPTS), os.cpu_count() or 1), mp_context=multiprocessing.get_context("forkserver")
+    ) as executor:
+        futures = []
+        for script in SCRIPTS:
+            script_data = clean_house_data(data, script.REQUIRED_COLUMNS)
+            if script_data.empty:
+                print(f"{script.__name__} 的数据为空，已跳过。")
+                continue
+            futures.append(executor.submit(render_with_default_style, script.render, script_data))
+
+        for future in futures:
+            future.result()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,58 @@
+import os
+import tempfile
+import unittest
+
+import orjson
+import pandas as pd
+
+from preprocessing import FIELDNAMES, json_to_csv
+
+
+class JsonToCsvTest(unittest.TestCase):
+    def convert(self, records):
+        """
+        将记录写入临时 JSON 文件，转换后读回 CSV
+        """
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            json_file = os.path.join(tmp_dir, "data.json")
+            csv_file = os.path.join(tmp_dir, "data.csv")
+            with open(json_file, "wb") as f:
+                f.write(orjson.dumps(records))
+            json_to_csv(json_file, csv_file)
+            return pd.read_csv(csv_file, encoding="utf-8-sig", dtype=str, keep_default_na=False)
+
+    def test_strings_are_stripped_and_numbers_extracted(self):
+        result = self.convert(
+            [
+                {
+                    "name": " 楼盘A ",
+                    "type": "住宅 ",
+                    "location": [" 朝阳", "望京 ", " 某路1号 "],
+                    "room": ["2室", "3室"],
+                    "area": "建面 80-100㎡",
+                    "total_price": "总价 500.8万/套",
+                    "unit_price": "60000 元/平",
+                }
+            ]
+        )
+
+        self.assertEqual(list(result.columns), FIELDNAMES)
+        self.assertEqual(
+            result.iloc[0].tolist(), ["楼盘A", "住宅", "朝阳", "望京", "某路1号", "2", "90", "500", "60000"]
+        )
+
+    def test_field_without_any_strings(self):
+        # 所有记录的同一字段都不是字符串时，按缺失值处理，而不是报错
+        records = [
+            {"name": 1, "type": None, "location": [1, 2, 3], "room": [2, 3], "area": 80, "total_price": 500},
+            {"name": 2, "type": None, "location": [4, 5, 6], "room": [4], "area": 90, "total_price": 600},
+        ]
+        result = self.convert(records)
+
+        self.assertEqual(len(result), 2)
+        for field in FIELDNAMES:
+            self.assertEqual(result[field].tolist(), ["", ""], field)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,150 @@
+import os
+import tempfile
+import unittest
+
+import numpy as np
+import pandas as pd
+import pyarrow.parquet as pq
+
+from utils import (
+    CACHE_SCHEMA,
+    CACHE_SCHEMA_KEY,
+    compute_cross_sums,
+    get_parquet_path,
+    is_cache_fresh,
+    load_house_data,
+    read_house_data,
+    sample_by_group,
+)
+
+
+def make_house_data(rows):
+    """
+    构造与 preprocessing 输出结构一致的楼盘数据
+    """
+    return pd.DataFrame(
+        {
+            "楼盘名称": [f"楼盘{i}" for i in range(rows)],
+            "类型": [["住宅", "别墅", "商业"][i % 3] for i in range(rows)],
+            "行政区": [["朝阳", "海淀", "丰台", "通州"][i % 4] for i in range(rows)],
+            "街道": "某街道",
+            "具体位置": "某路1号",
+            "房型": [i % 4 + 1 for i in range(rows)],
+            "面积": [60 + i for i in range(rows)],
+            "总价": [300 + i for i in range(rows)],
+            "均价": [50000 + i for i in range(rows)],
+        }
+    )
+
+
+class HouseDataTestCase(unittest.TestCase):
+    def setUp(self):
+        tmp_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp_dir.cleanup)
+        self.csv_file = os.path.join(tmp_dir.name, "data.csv")
+
+    def write_csv(self, data):
+        data.to_csv(self.csv_file, index=False, encoding="utf-8-sig")
+
+
+class ReadHouseDataTest(HouseDataTestCase):
+    def test_malformed_numeric_cell_becomes_missing(self):
+        # 数值列中个别无法解析的值只影响所在的行，不会导致整个文件读取失败
+        data = make_house_data(80).astype({"均价": object})
+        data.loc[10, "均价"] = "暂无"
+        self.write_csv(data)
+
+        raw = read_house_data(self.csv_file, ["楼盘名称", "均价"])
+        self.assertIsNotNone(raw)
+        self.assertEqual(len(raw), 80)
+        self.assertEqual(raw["均价"].dtype, "float64")
+        self.assertTrue(pd.isna(raw.loc[10, "均价"]))
+
+        cleaned = load_house_data(self.csv_file, ["楼盘名称", "行政区", "均价"])
+        self.assertEqual(len(cleaned), 79)
+        self.assertNotIn("楼盘10", cleaned["楼盘名称"].tolist())
+
+
+class ParquetCacheTest(HouseDataTestCase):
+    def setUp(self):
+        super().setUp()
+        self.parquet_file = get_parquet_path(self.csv_file)
+        self.write_csv(make_house_data(20))
+
+    def set_mtime(self, path, mtime):
+        os.utime(path, (mtime, mtime))
+
+    def test_cache_is_rebuilt_when_csv_is_newer(self):
+        self.assertFalse(is_cache_fresh(self.csv_file, self.parquet_file))
+        read_house_data(self.csv_file, ["楼盘名称"])
+        self.assertTrue(is_cache_fresh(self.csv_file, self.parquet_file))
+
+        # CSV 文件更新后缓存失效，重新读取时重新生成
+        self.write_csv(make_house_data(30))
+        self.set_mtime(self.parquet_file, 1_000_000)
+        self.set_mtime(self.csv_file, 2_000_000)
+        self.assertFalse(is_cache_fresh(self.csv_file, self.parquet_file))
+
+        self.assertEqual(len(read_house_data(self.csv_file, ["楼盘名称"])), 30)
+        self.assertTrue(is_cache_fresh(self.csv_file, self.parquet_file))
+
+    def test_cache_with_other_schema_is_rebuilt(self):
+        # 旧版本生成的缓存：比 CSV 新，但没有记录列类型，行政区也不是分类类型
+        make_house_data(20).to_parquet(self.parquet_file, index=False)
+        self.set_mtime(self.csv_file, 1_000_000)
+        self.set_mtime(self.parquet_file, 2_000_000)
+        self.assertFalse(is_cache_fresh(self.csv_file, self.parquet_file))
+
+        data = read_house_data(self.csv_file, ["行政区", "均价"])
+        self.assertIsInstance(data["行政区"].dtype, pd.CategoricalDtype)
+        self.assertEqual(data["均价"].dtype, "float64")
+        self.assertEqual(pq.read_schema(self.parquet_file).metadata[CACHE_SCHEMA_KEY], CACHE_SCHEMA)
+        self.assertTrue(is_cache_fresh(self.csv_file, self.parquet_file))
+
+
+class ComputeCrossSumsTest(unittest.TestCase):
+    def test_matches_groupby_sum(self):
+        data = make_house_data(50)
+        # 没有任何数据的类别也应出现在结果中，行数和各列之和为 0
+        data["行政区"] = pd.Categorical(data["行政区"], categories=["朝阳", "海淀", "丰台", "通州", "延庆"])
+        data["类型"] = pd.Categorical(data["类型"], categories=["住宅", "别墅", "商业", "写字楼"])
+        value_columns = ["均价", "总价"]
+
+        counts, sums = compute_cross_sums(data[value_columns].to_numpy(), data["行政区"], data["类型"])
+
+        grouped = data.groupby(["行政区", "类型"], observed=False)
+        shape = (5, 4)
+        np.testing.assert_array_equal(counts, grouped.size().to_numpy().reshape(shape))
+        np.testing.assert_allclose(sums, grouped[value_columns].sum().to_numpy().reshape(*shape, len(value_columns)))
+        self.assertEqual(counts[4].sum(), 0)
+        self.assertEqual(counts[:, 3].sum(), 0)
+
+    def test_empty_data(self):
+        rows = pd.Series(pd.Categorical([], categories=["朝阳", "海淀"]))
+        columns = pd.Series(pd.Categorical([], categories=["住宅"]))
+
+        counts, sums = compute_cross_sums(np.empty((0, 2)), rows, columns)
+
+        np.testing.assert_array_equal(counts, np.zeros((2, 1)))
+        np.testing.assert_array_equal(sums, np.zeros((2, 1, 2)))
+
+
+class SampleByGroupTest(unittest.TestCase):
+    def test_sample_never_exceeds_max_points(self):
+        # 各类别按比例分配的名额四舍五入后之和可能超过 max_points
+        for sizes, max_points in [((3335, 3335, 3330), 1000), ((15, 15, 15, 15, 15, 15, 10), 10)]:
+            data = pd.DataFrame({"类型": np.repeat(list("abcdefg"[: len(sizes)]), sizes), "均价": range(sum(sizes))})
+            sample = sample_by_group(data, "类型", max_points)
+
+            self.assertEqual(len(sample), max_points)
+            for group, size in zip("abcdefg", sizes):
+                self.assertLessEqual(abs((sample["类型"] == group).sum() - size * max_points / len(data)), 1)
+            self.assertTrue(sample.index.is_monotonic_increasing)
+
+    def test_small_data_is_returned_unchanged(self):
+        data = make_house_data(10)
+        self.assertIs(sample_by_group(data, "类型", 10), data)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -1,141 +1,168 @@
+import os
+
+import matplotlib
+import numpy as np
 import pandas as pd
-import matplotlib.pyplot as plt
 import squarify
-import os
+from matplotlib.cm import ScalarMappable
+from matplotlib.collections import PatchCollection
+from matplotlib.colors import Normalize
+from matplotlib.figure import Figure
+from matplotlib.patches import Rectangle
 
+from utils import HIGH_RES_DPI, PNG_PIL_KWARGS, compute_cross_sums, configure_plot, load_house_data
 
-def load_data(csv_file):
-    """
-    加载 CSV 数据，并进行必要的数据清洗和类型转换。
-    """
-    try:
-        data = pd.read_csv(csv_file, encoding="utf-8-sig")
-    except FileNotFoundError:
-        print(f"文件 {csv_file} 未找到。请确保文件路径正确。")
-        return None
-    except pd.errors.EmptyDataError:
-        print(f"文件 {csv_file} 是空的。")
-        return None
-    except pd.errors.ParserError as e:
-        print(f"解析 CSV 文件时出错: {e}")
-        return None
-
-    # 检查必要的列
-    required_columns = ["楼盘名称", "类型", "行政区", "面积", "均价", "总价"]
-    for col in required_columns:
-        if col not in data.columns:
-            print(f"缺少必要的列: {col}")
-            return None
-
-    # 处理数据类型
-    data["面积"] = pd.to_numeric(data["面积"], errors="coerce")
-    data["房型"] = pd.to_numeric(data["房型"], errors="coerce")
-    data["均价"] = pd.to_numeric(data["均价"], errors="coerce")
-    data["总价"] = pd.to_numeric(data["总价"], errors="coerce")
-    data["类型"] = data["类型"].astype(str)
-    data["行政区"] = data["行政区"].astype(str)
-
-    # 删除含有缺失值的行
-    data = data.dropna(subset=["楼盘名称", "类型", "行政区", "面积", "均价", "总价"])
-
-    return data
+# 必要的列
+REQUIRED_COLUMNS = ["楼盘名称", "类型", "行政区", "面积", "均价", "总价"]
+# 树状图布局所在矩形的宽和高（与 squarify.plot 的默认值一致）
+TREEMAP_WIDTH = 100
+TREEMAP_HEIGHT = 100
 
 
 def prepare_treemap_data(data):
     """
     按行政区和楼盘类型分组，计算每组的楼盘数量、平均单价和平均总价。
     """
-    grouped = (
-        data.groupby(["行政区", "类型"])
-        .agg(
-            楼盘数量=("楼盘名称", "count"),
-            平均单价=("均价", "mean"),
-            平均总价=("总价", "mean"),  # 计算平均总价
-        )
-        .reset_index()
+    values = data[["均价", "总价"]].to_numpy(dtype=np.float64)
+    counts, sums = compute_cross_sums(values, data["行政区"], data["类型"])
+
+    # 只保留出现过的组合，按 行政区、类型 的类别顺序排列
+    observed = counts > 0
+    district_codes, type_codes = np.nonzero(observed)
+    means = sums[observed] / counts[observed, None]
+
+    grouped = pd.DataFrame(
+        {
+            "行政区": data["行政区"].cat.categories[district_codes],
+            "类型": data["类型"].cat.categories[type_codes],
+            "楼盘数量": counts[observed],
+            "平均单价": means[:, 0],
+            "平均总价": means[:, 1],
+        }
     )
 
     return grouped
 
 
-def plot_treemap(grouped_data, output_image, color_metric="平均单价"):
+def build_label_prefixes(grouped_data):
+    """
+    生成每个方块标签中与颜色指标无关的部分（行政区、类型和楼盘数量），两张树状图共用。
+    """
+    return [
+        f"{district}\n{kind}\n数量: {count}\n"
+        for district, kind, count in zip(
+            grouped_data["行政区"].to_numpy(), grouped_data["类型"].to_numpy(), grouped_data["楼盘数量"].to_numpy()
+        )
+    ]
+
+
+def plot_treemap(grouped_data, label_prefixes, output_image, color_metric="平均单价"):
     """
     绘制树状图，并保存为图片文件。
 
     Parameters:
     - grouped_data: DataFrame，包含行政区、类型、楼盘数量、平均单价和平均总价
+    - label_prefixes: list of str，build_label_prefixes 生成的标签前缀
     - output_image: str，输出图片文件路径
     - color_metric: str，用于颜色编码的指标，可以是 '平均单价' 或 '平均总价'
     """
-    # 创建标签
-    grouped_data["标签"] = grouped_data.apply(
-        lambda row: f"{row['行政区']}\n{row['类型']}\n数量: {row['楼盘数量']}\n{color_metric}: {int(row[color_metric])}",
-        axis=1,
-    )
+    # 创建标签（在共用的前缀后追加指标值，指标值一次性截断为整数）
+    metric_values = grouped_data[color_metric].to_numpy().astype("int64")
+    labels = [f"{prefix}{color_metric}: {value}" for prefix, value in zip(label_prefixes, metric_values)]
 
     # 设置颜色范围
-    norm = plt.Normalize(grouped_data[color_metric].min(), grouped_data[color_metric].max())
-    cmap = plt.cm.Blues if color_metric == "平均单价" else plt.cm.Oranges
+    norm = Normalize(grouped_data[color_metric].min(), grouped_data[color_metric].max())
+    cmap = matplotlib.colormaps["Blues" if color_metric == "平均单价" else "Oranges"]
     colors = cmap(norm(grouped_data[color_metric]))
 
-    # 创建图形和树状图的绘图区
-    plt.figure(figsize=(16, 12))
-    plt.rcParams["font.sans-serif"] = ["STHeiti"]
+    # 创建图形和树状图的绘图区（直接使用 Figure，不经过 pyplot 的全局状态，用完即被回收）
+    fig = Figure(figsize=(16, 12))
+    ax = fig.add_subplot()
 
-    # 绘制树状图
-    squarify.plot(
-        sizes=grouped_data["楼盘数量"], label=grouped_data["标签"], color=colors, alpha=0.8, edgecolor="white"
-    )
+    # 绘制树状图：squarify 只负责计算方块布局，所有方块放在一个 PatchCollection 中一次绘制
+    sizes = squarify.normalize_sizes(grouped_data["楼盘数量"].to_numpy(), TREEMAP_WIDTH, TREEMAP_HEIGHT)
+    rects = squarify.squarify(sizes, 0, 0, TREEMAP_WIDTH, TREEMAP_HEIGHT)
+    patches = [Rectangle((rect["x"], rect["y"]), rect["dx"], rect["dy"]) for rect in rects]
+    ax.add_collection(PatchCollection(patches, facecolors=colors, edgecolors="white", alpha=0.8))
+    for label, rect in zip(labels, rects):
+        ax.text(rect["x"] + rect["dx"] / 2, rect["y"] + rect["dy"] / 2, label, va="center", ha="center")
+    ax.set_xlim(0, TREEMAP_WIDTH)
+    ax.set_ylim(0, TREEMAP_HEIGHT)
 
     # 设置标题
-    plt.title(f"各行政区与楼盘类型的树状图（按{color_metric}）", fontsize=20)
+    ax.set_title(f"各行政区与楼盘类型的树状图（按{color_metric}）", fontsize=20)
 
     # 关闭坐标轴
-    plt.axis("off")
+    ax.axis("off")
 
     # 创建一个新的轴，用于颜色条
-    cax = plt.axes([0.92, 0.1, 0.02, 0.8])  # [left, bottom, width, height]
-    sm = plt.cm.ScalarMappable(cmap=cmap, norm=norm)
+    cax = fig.add_axes([0.92, 0.1, 0.02, 0.8])  # [left, bottom, width, height]
+    sm = ScalarMappable(cmap=cmap, norm=norm)
     sm.set_array([])
-    cbar = plt.colorbar(sm, cax=cax)
+    cbar = fig.colorbar(sm, cax=cax)
     cbar.set_label(color_metric, fontsize=14)
 
     # 调整布局
-    plt.tight_layout(rect=[0, 0, 0.9, 1])  # 留出右侧空间给颜色条
+    fig.tight_layout(rect=[0, 0, 0.9, 1])  # 留出右侧空间给颜色条
 
     # 保存图表
-    plt.savefig(output_image, dpi=300)
-    plt.close()
+    fig.savefig(output_image, dpi=HIGH_RES_DPI, pil_kwargs=PNG_PIL_KWARGS)
     print(f"树状图已保存为 {output_image}")
 
 
-def main():
-    input_csv = "../new_house_data.csv"  # 输入的 CSV 文件路径
+def render(data):
+    """
+    根据已清洗的数据绘制本脚本的全部图表。
+
+    Parameters:
+    - data: DataFrame，包含 REQUIRED_COLUMNS 的已清洗数据
+    """
     output_image_unit_price = "../figire/treemap_average_unit_price.png"  # 输出的按平均单价的树状图路径
     output_image_total_price = "../figire/treemap_average_total_price.png"  # 输出的按平均总价的树状图路径
 
+    # 设置绘图样式和中文字体
+    configure_plot()
+
+    # 准备树状图数据
+    grouped_data = prepare_treemap_data(data)
+    if grouped_data.empty:
+        print("分组后的数据为空。")
+        return
+
+    # 标签中与颜色指标无关的部分只生成一次
+    label_prefixes = build_label_prefixes(grouped_data)
+
+    # 分别按平均单价和平均总价绘制树状图
+    plot_treemap(
+        grouped_data=grouped_data,
+        label_prefixes=label_prefixes,
+        output_image=output_image_unit_price,
+        color_metric="平均单价",
+    )
+    plot_treemap(
+        grouped_data=grouped_data,
+        label_prefixes=label_prefixes,
+        output_image=output_image_total_price,
+        color_metric="平均总价",
+    )
+
+
+def main():
+    input_csv = "../new_house_data.csv"  # 输入的 CSV 文件路径
+
     # 检查输入文件是否存在
     if not os.path.exists(input_csv):
         print(f"输入文件 {input_csv} 不存在。请确保文件路径正确。")
         return
 
     # 加载和处理数据
-    data = load_data(input_csv)
+    data = load_house_data(input_csv, REQUIRED_COLUMNS)
     if data is None or data.empty:
         print("数据加载失败或数据为空。")
         return
 
-    # 准备树状图数据
-    grouped_data = prepare_treemap_data(data)
-    if grouped_data.empty:
-        print("分组后的数据为空。")
-        return
-
-    # 绘制按平均单价的树状图
-    plot_treemap(grouped_data=grouped_data, output_image=output_image_unit_price, color_metric="平均单价")
-
-    # 绘制按平均总价的树状图
-    plot_treemap(grouped_data=grouped_data, output_image=output_image_total_price, color_metric="平均总价")
+    # 绘制图表
+    render(data)
 
 
 if __name__ == "__main__":
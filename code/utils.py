@@ -0,0 +1,251 @@
+import json
+import os
+
+import matplotlib
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+# 解析 CSV 时各列的数据类型，取值种类少的字符串列直接解析为分类类型
+COLUMN_DTYPES = {
+    "楼盘名称": "string",
+    "类型": "category",
+    "行政区": "category",
+    "房型": "float64",
+    "面积": "float64",
+    "总价": "float64",
+    "均价": "float64",
+}
+# 写入 Parquet 缓存元数据的列类型，与当前的 COLUMN_DTYPES 不一致时重新生成缓存
+CACHE_SCHEMA_KEY = b"house_data.column_dtypes"
+CACHE_SCHEMA = json.dumps(COLUMN_DTYPES, ensure_ascii=False, sort_keys=True).encode()
+# 数值列，删除缺失值后向下转换为最小的整数类型
+NUMERIC_COLUMNS = ["房型", "面积", "总价", "均价"]
+# 分类类型的列（分组时直接使用整数编码）
+CATEGORY_COLUMNS = [col for col, dtype in COLUMN_DTYPES.items() if dtype == "category"]
+# 散点图最多绘制的点数，超过时按类别分层抽样
+SCATTER_MAX_POINTS = 5000
+# 保存图片的分辨率，150 DPI 在屏幕和文档中与 300 DPI 几乎没有差别
+SAVEFIG_DPI = 150
+# 雷达图和矩形树图仍按原来的 300 DPI 保存
+HIGH_RES_DPI = 300
+# PNG 编码参数，使用最快的 zlib 压缩级别
+PNG_PIL_KWARGS = {"compress_level": 1}
+# 全局绘图参数：中文字体，并用 ASCII 减号避免负号显示为方框
+PLOT_RC = {"font.sans-serif": ["STHeiti"], "axes.unicode_minus": False}
+
+
+def get_parquet_path(csv_file):
+    """
+    返回与 CSV 文件同名的 Parquet 缓存文件路径。
+    """
+    return os.path.splitext(csv_file)[0] + ".parquet"
+
+
+def is_cache_fresh(csv_file, parquet_file):
+    """
+    判断 Parquet 缓存是否存在、不早于 CSV 文件的修改时间，且是按当前的 COLUMN_DTYPES 生成的。
+    """
+    if not os.path.exists(parquet_file):
+        return False
+    if os.path.exists(csv_file) and os.path.getmtime(parquet_file) < os.path.getmtime(csv_file):
+        return False
+
+    try:
+        metadata = pq.read_schema(parquet_file).metadata or {}
+    except (OSError, pa.ArrowInvalid):
+        return False
+    return metadata.get(CACHE_SCHEMA_KEY) == CACHE_SCHEMA
+
+
+def write_cache(data, parquet_file):
+    """
+    将数据写入 Parquet 缓存，并在元数据中记录生成缓存时的列类型。
+    """
+    table = pa.Table.from_pandas(data, preserve_index=False)
+    table = table.replace_schema_metadata({**table.schema.metadata, CACHE_SCHEMA_KEY: CACHE_SCHEMA})
+    pq.write_table(table, parquet_file, compression="zstd")
+
+
+def read_csv_data(csv_file):
+    """
+    使用 pyarrow 引擎（多线程）解析 CSV 文件，并按 COLUMN_DTYPES 确定各列的数据类型。
+
+    数值列先按原样解析为对象，再转换为数值，无法转换的值（如“暂无”）处理为缺失值，
+    而不是让整个文件读取失败。
+
+    Parameters:
+    - csv_file: str，CSV 文件路径
+
+    Returns:
+    - DataFrame 或 None
+    """
+    dtypes = {col: object if col in NUMERIC_COLUMNS else dtype for col, dtype in COLUMN_DTYPES.items()}
+    try:
+        data = pd.read_csv(csv_file, encoding="utf-8-sig", dtype=dtypes, engine="pyarrow")
+    except FileNotFoundError:
+        print(f"文件 {csv_file} 未找到。请确保文件路径正确。")
+        return None
+    except pd.errors.EmptyDataError:
+        print(f"文件 {csv_file} 是空的。")
+        return None
+    except (pd.errors.ParserError, ValueError) as e:
+        print(f"解析 CSV 文件时出错: {e}")
+        return None
+
+    # 将数值列转换为浮点数，处理缺失或非数值的数据
+    for col in NUMERIC_COLUMNS:
+        if col in data.columns:
+            data[col] = pd.to_numeric(data[col], errors="coerce").astype(COLUMN_DTYPES[col])
+
+    return data
+
+
+def read_house_data(csv_file, columns, dropna=False):
+    """
+    读取楼盘数据的指定列。
+
+    首次调用时解析 CSV 并将转换好类型的数据缓存为 Parquet 文件，之后直接读取缓存，
+    只读取需要的列，无需重复解析和类型转换。CSV 文件比缓存新，或 COLUMN_DTYPES 改变时重新生成缓存。
+
+    Parameters:
+    - csv_file: str，CSV 文件路径
+    - columns: list of str，需要读取的列名
+    - dropna: bool，是否删除这些列中含有缺失值的行；删除在 Arrow 表上完成，转换为 DataFrame 之前即已去掉
+
+    Returns:
+    - DataFrame 或 None
+    """
+    parquet_file = get_parquet_path(csv_file)
+
+    if not is_cache_fresh(csv_file, parquet_file):
+        data = read_csv_data(csv_file)
+        if data is None:
+            return None
+        write_cache(data, parquet_file)
+
+    # 检查必要的列，一次性报告所有缺少的列
+    missing = set(columns) - set(pq.read_schema(parquet_file).names)
+    if missing:
+        print(f"缺少必要的列: {sorted(missing)}")
+        return None
+
+    if dropna:
+        return pq.read_table(parquet_file, columns=columns).drop_null().to_pandas()
+
+    return pd.read_parquet(parquet_file, engine="pyarrow", columns=columns)
+
+
+def clean_house_data(data, required_columns, dropna=True):
+    """
+    选取必要的列，并删除含有缺失值的行。
+
+    Parameters:
+    - data: DataFrame，read_house_data 读取的数据
+    - required_columns: list of str，必要的列名
+    - dropna: bool，是否删除含有缺失值的行；数据已在 Arrow 表上删除过缺失值时传入 False，避免再扫描一遍
+
+    Returns:
+    - DataFrame，已清洗的数据
+    """
+    data = data[required_columns]
+
+    # 删除含有缺失值的行
+    if dropna:
+        data = data.dropna(subset=required_columns)
+
+    # 移除删除缺失值后不再出现的类别
+    for col in CATEGORY_COLUMNS:
+        if col in data.columns:
+            data[col] = data[col].cat.remove_unused_categories()
+
+    # 数值均为整数，向下转换以减少后续分组聚合时扫描的字节数
+    for col in NUMERIC_COLUMNS:
+        if col in data.columns:
+            data[col] = pd.to_numeric(data[col], downcast="integer")
+
+    return data
+
+
+def load_house_data(csv_file, required_columns):
+    """
+    加载楼盘数据，并进行必要的数据清洗。
+
+    Parameters:
+    - csv_file: str，CSV 文件路径
+    - required_columns: list of str，必要的列名
+
+    Returns:
+    - DataFrame 或 None
+    """
+    data = read_house_data(csv_file, required_columns, dropna=True)
+    if data is None:
+        return None
+
+    # 缺失值已在读取时删除
+    return clean_house_data(data, required_columns, dropna=False)
+
+
+def compute_cross_sums(values, rows, columns):
+    """
+    按两个分类列的组合分组，一次性统计各组的行数和各数值列之和。
+
+    直接用分类编码做 np.bincount，只需扫描一次数据，比 groupby 逐列聚合快得多。
+    任一分类列的分组结果都可以由这张交叉表沿另一维求和得到，无需再次扫描全部数据。
+
+    Parameters:
+    - values: ndarray，需要求和的数值矩阵，各行与分类列一一对应
+    - rows: Series，第一个分类列，如 '行政区'
+    - columns: Series，第二个分类列，如 '类型'
+
+    Returns:
+    - counts: ndarray，形状为 (第一列类别数, 第二列类别数)，各组的行数
+    - sums: ndarray，形状为 (第一列类别数, 第二列类别数, 数值列数)，各组数值列之和
+    """
+    shape = (len(rows.cat.categories), len(columns.cat.categories))
+    codes = rows.cat.codes.to_numpy().astype(np.intp) * shape[1] + columns.cat.codes.to_numpy()
+    size = shape[0] * shape[1]
+
+    counts = np.bincount(codes, minlength=size).reshape(shape)
+    sums = np.stack([np.bincount(codes, weights=column, minlength=size) for column in values.T], axis=-1)
+
+    return counts, sums.reshape(*shape, -1)
+
+
+def sample_by_group(data, by, max_points=SCATTER_MAX_POINTS):
+    """
+    数据量超过 max_points 时，按类别分层抽样，保持各类别所占比例不变。
+
+    散点图中大量的点会相互重叠，抽样后的图形几乎没有差别，但绘制快很多。
+    各类别按比例分配的名额先向下取整，剩余的名额按最大余数分配，抽样后正好保留 max_points 行。
+
+    Parameters:
+    - data: DataFrame，需要抽样的数据
+    - by: str，分层抽样使用的类别列名
+    - max_points: int，最多保留的行数
+
+    Returns:
+    - DataFrame，抽样后的数据
+    """
+    if len(data) <= max_points:
+        return data
+
+    quotas = data[by].value_counts(sort=False) * (max_points / len(data))
+    counts = np.floor(quotas).astype(int)
+    extra = (quotas - counts).sort_values(ascending=False, kind="stable").index[: max_points - counts.sum()]
+    counts[extra] += 1
+
+    # 打乱顺序后，每个类别取前面的若干行，再恢复原来的顺序
+    shuffled = data.sample(frac=1, random_state=0)
+    keep = shuffled.groupby(by, observed=True).cumcount().to_numpy() < counts.reindex(shuffled[by]).to_numpy()
+    return shuffled[keep].sort_index()
+
+
+def configure_plot():
+    """
+    设置中文字体等全局绘图参数，在绘图前调用一次即可。
+
+    seaborn 的 set_theme 会重置字体设置，因此需要在其之后调用。
+    """
+    matplotlib.rcParams.update(PLOT_RC)